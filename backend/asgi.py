@@ -0,0 +1,420 @@
+#!/usr/bin/env python3
+"""
+Async serving mode for the LangChain Database Analytics Backend.
+
+/api/ask and /api/ask/stream are served by async Quart handlers: LLM calls use the
+async runnable APIs and database work is offloaded to a thread pool, so one process
+can keep hundreds of questions waiting on the LLM without a thread each. Every other
+route is still the Flask app from app.py, run on worker threads.
+
+    hypercorn asgi:application --bind 0.0.0.0:5000
+    SERVER_MODE=asgi python start.py
+"""
+
+import os
+import time
+import asyncio
+import contextvars
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
+from quart import Quart, Response, g, request, jsonify
+from hypercorn.middleware import AsyncioWSGIMiddleware
+
+import app as backend
+
+
+# Blocking work (queries, schema introspection, formatting) runs here instead of on the event loop.
+# Queries still take a pooled connection each, so the pool sizes in databases.json stay the real limit.
+ASGI_BLOCKING_WORKERS = int(os.getenv("ASGI_BLOCKING_WORKERS", "32"))
+blocking_executor = ThreadPoolExecutor(max_workers=ASGI_BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+# Routes served by the async handlers below; everything else goes to the Flask app
+ASYNC_ROUTES = {"/api/ask", "/api/ask/stream"}
+
+
+async def run_blocking(fn, *args):
+    """Run blocking pipeline code on the offload pool, seeing this task's context variables"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(blocking_executor, contextvars.copy_context().run, fn, *args)
+
+
+@contextmanager
+def cancel_task_on(token):
+    """Cancel the current task when the request's token is cancelled (e.g. by /api/ask/<id>/cancel)"""
+    loop = asyncio.get_running_loop()
+    task = asyncio.current_task()
+    unregister = token.on_cancel(lambda: loop.call_soon_threadsafe(task.cancel))
+    try:
+        yield
+    finally:
+        unregister()
+
+
+# --- Async pipeline: the same steps as app.py, awaiting the LLM instead of blocking on it ---
+
+async def stream_suggestions(question, database_name="chinook", planner=False):
+    """Yield each suggestion from one streamed LLM call as soon as its JSON object is complete"""
+    stage, chain, inputs = await run_blocking(backend.suggestion_request, question, database_name, planner)
+    parser = backend.SuggestionStreamParser()
+    count = 0
+    try:
+        with backend.stage_timer(stage):
+            async for chunk in chain.astream(inputs, config=backend.llm_config()):
+                for suggestion in parser.feed(chunk):
+                    count += 1
+                    print(f"  {count}. {suggestion.get('chart_type')} - {suggestion.get('title')}")
+                    yield suggestion
+    except Exception as e:
+        print(f"Error in {stage}: {e}")
+    if count == 0:
+        print(f"No chart suggestions parsed from {stage} response: {parser.buffer[:500]}")
+
+
+async def iter_chart_suggestions(question, database_name="chinook", planner=None):
+    """Async counterpart of app.iter_chart_suggestions, with the same fallbacks"""
+    if backend.CHART_PLANNER if planner is None else planner:
+        planned = 0
+        async for suggestion in stream_suggestions(question, database_name, planner=True):
+            planned += 1
+            yield suggestion
+        if planned:
+            return
+        print("Chart planning gave no suggestions, falling back to separate suggestion and SQL calls")
+
+    suggested = 0
+    async for suggestion in stream_suggestions(question, database_name):
+        suggested += 1
+        yield suggestion
+    if not suggested:
+        for suggestion in backend.default_chart_suggestions(question, "Default bar chart"):
+            yield suggestion
+
+
+async def generate_sql(question, database_name="chinook", sql_focus=None, sql_chain=None):
+    """Generate SQL with the shared cache, validation and retries; only the LLM call is awaited"""
+    steps = backend.sql_generation_steps(question, database_name, sql_focus)
+    done, value = await run_blocking(backend.advance_steps, steps, None)
+    while not done:
+        if sql_chain is None:
+            sql_chain = backend.create_sql_chain(database_name)
+        with backend.stage_timer("sql_generation"):
+            query = await sql_chain.ainvoke({"question": value, "database": database_name}, config=backend.llm_config())
+        done, value = await run_blocking(backend.advance_steps, steps, query)
+    return value
+
+
+async def build_chart(suggestion, question, database_name="chinook", sql_chain=None):
+    """Run SQL generation, execution and formatting for one chart suggestion"""
+    try:
+        chart_type = suggestion.get("chart_type", "bar")
+        sql_focus = suggestion.get("sql_focus", "Main data points")
+        max_rows = backend.get_chart_fetch_limit(chart_type)
+
+        query_result = await run_blocking(backend.run_planned_query, suggestion, database_name, max_rows)
+        query = backend.strip_sql_fences(suggestion.get("sql") or "")
+        if query_result is None:
+            query = await generate_sql(question, database_name, sql_focus, sql_chain)
+            print(f"Generated SQL for {chart_type}: {query}")
+            query_result = await run_blocking(backend.run_query_with_columns, query, database_name, max_rows)
+        return await run_blocking(backend.chart_from_result, suggestion, question, query_result, query, database_name)
+
+    except backend.RequestCancelled:
+        raise
+    except Exception as e:
+        return backend.error_chart(suggestion, e)
+
+
+async def generate_narrative(question, charts):
+    """Generate connecting narrative for charts (single or multiple)"""
+    try:
+        with backend.stage_timer("narrative"):
+            response = await backend.narrative_chain().ainvoke(
+                backend.narrative_inputs(question, charts), config=backend.llm_config()
+            )
+        return backend.parse_narrative(response)
+    except backend.RequestCancelled:
+        raise
+    except Exception as e:
+        print(f"Error generating narrative: {e}")
+        return backend.fallback_narrative(question, charts)
+
+
+async def create_single_chart(question, database_name="chinook"):
+    """The single-chart pipeline is rarely used, so it stays on the threaded path"""
+    return await run_blocking(lambda: backend.create_single_chart(question, database_name)({"question": question}))
+
+
+async def start_charts(tasks, suggestions, question, database_name="chinook"):
+    """Start a chart task for each suggestion as soon as it streams in, appending them to tasks"""
+    sql_chain = backend.create_sql_chain(database_name)
+    async for suggestion in suggestions:
+        tasks.append(asyncio.ensure_future(build_chart(suggestion, question, database_name, sql_chain)))
+
+
+async def create_multiple_charts(question, database_name="chinook", planner=None):
+    """Generate multiple charts for a single question"""
+    tasks = []
+    try:
+        await start_charts(tasks, iter_chart_suggestions(question, database_name, planner), question, database_name)
+        if not tasks:
+            return await create_single_chart(question, database_name)
+
+        charts = list(await asyncio.gather(*tasks))
+        print(f"Total charts generated: {len(charts)}")
+        return {"charts": charts, "narrative": await generate_narrative(question, charts)}
+
+    except backend.RequestCancelled:
+        raise
+    except Exception as e:
+        print(f"Error in create_multiple_charts: {e}")
+        return await create_single_chart(question, database_name)
+    finally:
+        # Charts still running when the request is cancelled stop with it
+        for task in tasks:
+            task.cancel()
+
+
+async def answer_question(question, database="chinook", generate_multiple=True, planner=None):
+    """Run the full question pipeline and build the /api/ask response body"""
+    with backend.stage_timer("pipeline"):
+        if generate_multiple:
+            return backend.ask_response(question, database, await create_multiple_charts(question, database, planner))
+        return backend.ask_response(question, database, await create_single_chart(question, database))
+
+
+class AsyncSingleFlight:
+    """
+    Coalesce concurrent async calls that share a key, like app.SingleFlight: the shared
+    run has its own cancel token and is only cancelled once every caller has gone.
+    """
+
+    def __init__(self):
+        self.calls = {}
+        self.coalesced = 0
+
+    async def do(self, key, fn):
+        call = self.calls.get(key)
+        if call is None:
+            call = {"task": asyncio.ensure_future(self._run(fn)), "waiters": 0}
+            self.calls[key] = call
+            call["task"].add_done_callback(lambda _: self._forget(key, call))
+        else:
+            self.coalesced += 1
+
+        call["waiters"] += 1
+        try:
+            return await asyncio.shield(call["task"])
+        except asyncio.CancelledError:
+            call["waiters"] -= 1
+            if call["waiters"] == 0:
+                call["task"].cancel()
+            raise
+
+    def _forget(self, key, call):
+        if self.calls.get(key) is call:
+            del self.calls[key]
+
+    async def _run(self, fn):
+        token = backend.CancelToken()
+        backend.current_cancel_token.set(token)
+        try:
+            return await fn()
+        except asyncio.CancelledError:
+            token.cancel()
+            raise
+
+
+ask_flight = AsyncSingleFlight()
+
+
+# --- Routes ---
+
+asgi_app = Quart(__name__)
+# Pipelines routinely outlive Quart's default 60 second response timeout
+asgi_app.config["RESPONSE_TIMEOUT"] = None
+
+
+@asgi_app.before_request
+async def start_request_timing():
+    g.request_started = time.perf_counter()
+    backend.request_timings.set([])
+
+
+@asgi_app.after_request
+async def finish_request(response):
+    started = g.get('request_started')
+    if started is not None:
+        backend.metrics.observe("nqv_http_request_duration_seconds", time.perf_counter() - started,
+                                endpoint=request.url_rule.rule if request.url_rule else "unmatched")
+
+    timings = backend.request_timings.get()
+    if backend.SERVER_TIMING_HEADER and timings:
+        response.headers['Server-Timing'] = backend.server_timing(timings)
+
+    # Same open CORS policy that flask_cors applies to the Flask routes
+    response.headers['Access-Control-Allow-Origin'] = '*'
+    if request.method == 'OPTIONS':
+        response.headers['Access-Control-Allow-Methods'] = 'POST, OPTIONS'
+        response.headers['Access-Control-Allow-Headers'] = request.headers.get('Access-Control-Request-Headers', '*')
+    return response
+
+
+def request_error(data):
+    """The 400 response for an invalid /api/ask body, or None if it is fine"""
+    if not data or 'question' not in data:
+        return jsonify({"error": "Question is required"}), 400
+    if data.get('database', 'chinook') not in backend.databases:
+        return jsonify({"error": f"Database '{data.get('database')}' not found"}), 400
+    if data.get('format', 'rows') not in backend.CHART_DATA_FORMATS:
+        return jsonify({"error": f"Unknown format '{data.get('format')}'"}), 400
+    return None
+
+
+def cancelled_by_disconnect(token, request_id):
+    """Our task was cancelled by the server (the client went away): stop the blocking work too"""
+    if token.cancel():
+        backend.metrics.increment("nqv_cancelled_total", reason="disconnect")
+        print(f"🛑 Client disconnected, cancelled request {request_id}")
+
+
+@asgi_app.route('/api/ask', methods=['POST'])
+async def ask_question():
+    """Process natural language question and return chart data"""
+    data = await request.get_json()
+    error = request_error(data)
+    if error is not None:
+        return error
+
+    question = data['question']
+    database = data.get('database', 'chinook')
+    generate_multiple = bool(data.get('multiple_charts', True))
+    planner = bool(data.get('planner', backend.CHART_PLANNER))
+    data_format = data.get('format', 'rows')
+    request_id = backend.request_id_from(data, request.headers)
+
+    with backend.cancellable_request(request_id) as token:
+        try:
+            with cancel_task_on(token):
+                response = await ask_flight.do(
+                    (question.strip(), database, generate_multiple, planner),
+                    lambda: answer_question(question, database, generate_multiple, planner)
+                )
+            return jsonify(dict(backend.answer_in_format(response, data_format), request_id=request_id))
+        except asyncio.CancelledError:
+            if not token.cancelled:
+                cancelled_by_disconnect(token, request_id)
+                raise
+            # Cancelled through the API: answer like the threaded route does
+            asyncio.current_task().uncancel()
+            return jsonify(backend.RequestCancelled().to_dict()), backend.RequestCancelled.status_code
+        except backend.RequestCancelled as e:
+            return jsonify(e.to_dict()), e.status_code
+        except Exception as e:
+            return jsonify({"error": str(e)}), 500
+
+
+@asgi_app.route('/api/ask/stream', methods=['POST'])
+async def ask_question_stream():
+    """Stream the multi-chart answer as Server-Sent Events (same events as the Flask route)"""
+    data = await request.get_json()
+    error = request_error(data)
+    if error is not None:
+        return error
+
+    question = data['question']
+    database = data.get('database', 'chinook')
+    planner = bool(data.get('planner', backend.CHART_PLANNER))
+    data_format = data.get('format', 'rows')
+    request_id = backend.request_id_from(data, request.headers)
+
+    async def generate():
+        with backend.cancellable_request(request_id) as token:
+            suggestions = []
+
+            async def collect():
+                async for suggestion in iter_chart_suggestions(question, database, planner):
+                    suggestions.append(suggestion)
+                    yield suggestion
+
+            tasks = []
+            try:
+                with cancel_task_on(token):
+                    await start_charts(tasks, collect(), question, database)
+                    yield backend.sse_event("suggestions", {
+                        "suggestions": suggestions,
+                        "question": question,
+                        "database": database,
+                        "request_id": request_id
+                    })
+
+                    # Send each chart as soon as it finishes, whatever its position
+                    charts = [None] * len(tasks)
+                    indexes = {task: index for index, task in enumerate(tasks)}
+                    pending = set(tasks)
+                    while pending:
+                        done, pending = await asyncio.wait(pending, timeout=backend.SSE_HEARTBEAT_SECONDS,
+                                                           return_when=asyncio.FIRST_COMPLETED)
+                        if not done:
+                            yield backend.SSE_HEARTBEAT
+                            continue
+                        for task in done:
+                            index = indexes[task]
+                            charts[index] = task.result()
+                            yield backend.sse_event("chart", {"index": index, "chart": backend.chart_in_format(charts[index], data_format)})
+
+                    narrative = await generate_narrative(question, charts)
+                    yield backend.sse_event("narrative", {"narrative": narrative})
+                    yield backend.sse_event("done", {"success": True})
+            except GeneratorExit:
+                # Closed by the server before we finished: the client went away between events
+                cancelled_by_disconnect(token, request_id)
+                raise
+            except asyncio.CancelledError:
+                if not token.cancelled:
+                    cancelled_by_disconnect(token, request_id)
+                    raise
+                asyncio.current_task().uncancel()
+                yield backend.sse_event("error", backend.RequestCancelled().to_dict())
+            except backend.RequestCancelled as e:
+                yield backend.sse_event("error", e.to_dict())
+            except Exception as e:
+                print(f"Error in streamed answer: {e}")
+                yield backend.sse_event("error", {"error": str(e)})
+            finally:
+                for task in tasks:
+                    task.cancel()
+
+    response = Response(generate(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',  # Keep reverse proxies from buffering the stream
+        'X-Request-ID': request_id
+    })
+    response.timeout = None
+    return response
+
+
+# Flask routes run on hypercorn's WSGI adapter (a worker thread per request)
+flask_app = AsyncioWSGIMiddleware(backend.app, max_body_size=1024 * 1024)
+
+
+async def application(scope, receive, send):
+    """ASGI entry point: async routes (and lifespan events) go to Quart, the rest to Flask"""
+    if scope["type"] != "http" or scope["path"] in ASYNC_ROUTES:
+        await asgi_app(scope, receive, send)
+    else:
+        await flask_app(scope, receive, send)
+
+
+def serve(host="0.0.0.0", port=5000):
+    """Serve the ASGI app with hypercorn"""
+    from hypercorn.asyncio import serve as hypercorn_serve
+    from hypercorn.config import Config
+
+    config = Config()
+    config.bind = [f"{host}:{port}"]
+    asyncio.run(hypercorn_serve(application, config))
+
+
+if __name__ == '__main__':
+    serve()
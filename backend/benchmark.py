@@ -0,0 +1,636 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the LangChain Database Analytics Backend.
+
+Loads the repo's Chinook_MySql.sql into a local SQLite file, swaps ChatOpenAI for
+a deterministic stub with configurable latency and canned SQL, then drives the
+Flask endpoints through fixed question sets. No network access or OpenAI key is
+needed.
+
+    python benchmark.py                          # default run
+    python benchmark.py --llm-latency 0.2 --concurrency 8 --iterations 10
+    python benchmark.py --json results.json      # save results
+    python benchmark.py --baseline results.json  # fail if p95 regressed
+    python benchmark.py --asgi                   # question routes through the async handlers
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import asyncio
+import sqlite3
+import argparse
+import tempfile
+import threading
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+CHINOOK_SQL = os.path.join(os.path.dirname(BACKEND_DIR), "Chinook_MySql.sql")
+
+# Canned answers for the stub LLM. Each question maps to the chart suggestions it returns;
+# each sql_focus maps to the SQL returned when that focus appears in a SQL prompt.
+QUESTIONS = {
+    "Which genres have the most tracks?": [
+        {"chart_type": "bar", "title": "Tracks per Genre", "sql_focus": "track count per genre"},
+        {"chart_type": "pie", "title": "Tracks by Media Type", "sql_focus": "track share by media type"},
+    ],
+    "Who are our top customers?": [
+        {"chart_type": "table", "title": "Customer Spending", "sql_focus": "total spending per customer"},
+        {"chart_type": "bar", "title": "Revenue by Country", "sql_focus": "revenue per billing country"},
+    ],
+    "Show me sales trends by year": [
+        {"chart_type": "line", "title": "Revenue per Year", "sql_focus": "revenue per year"},
+        {"chart_type": "bar", "title": "Invoices per Month", "sql_focus": "invoice count per month"},
+    ],
+    "Is track length related to file size?": [
+        {"chart_type": "scatter", "title": "Track Length vs Size", "sql_focus": "track length against file size"},
+        {"chart_type": "table", "title": "Longest Tracks", "sql_focus": "longest tracks with album and genre"},
+    ],
+}
+
+CANNED_SQL = {
+    "track count per genre": """
+        SELECT a.Name, COUNT(b.TrackId) AS TrackCount
+        FROM Genre AS a
+        JOIN Track AS b ON a.GenreId = b.GenreId
+        GROUP BY a.Name
+        ORDER BY TrackCount DESC""",
+    "track share by media type": """
+        SELECT a.Name, COUNT(b.TrackId) AS TrackCount
+        FROM MediaType AS a
+        JOIN Track AS b ON a.MediaTypeId = b.MediaTypeId
+        GROUP BY a.Name
+        ORDER BY TrackCount DESC""",
+    "total spending per customer": """
+        SELECT a.FirstName, a.LastName, a.Country, a.City, SUM(b.Total) AS TotalPurchases
+        FROM Customer AS a
+        JOIN Invoice AS b ON a.CustomerId = b.CustomerId
+        GROUP BY a.CustomerId, a.FirstName, a.LastName, a.Country, a.City
+        ORDER BY TotalPurchases DESC""",
+    "revenue per billing country": """
+        SELECT a.BillingCountry, SUM(a.Total) AS Revenue
+        FROM Invoice AS a
+        GROUP BY a.BillingCountry
+        ORDER BY Revenue DESC""",
+    "revenue per year": """
+        SELECT SUBSTR(a.InvoiceDate, 1, 4) AS InvoiceYear, SUM(a.Total) AS Revenue
+        FROM Invoice AS a
+        GROUP BY InvoiceYear
+        ORDER BY InvoiceYear""",
+    "invoice count per month": """
+        SELECT SUBSTR(a.InvoiceDate, 1, 7) AS InvoiceMonth, COUNT(a.InvoiceId) AS Invoices
+        FROM Invoice AS a
+        GROUP BY InvoiceMonth
+        ORDER BY InvoiceMonth DESC""",
+    "track length against file size": """
+        SELECT a.Name, a.Milliseconds, a.Bytes
+        FROM Track AS a
+        ORDER BY a.Milliseconds DESC""",
+    "longest tracks with album and genre": """
+        SELECT a.Name, b.Title, c.Name AS Genre, a.Milliseconds, a.UnitPrice
+        FROM Track AS a
+        JOIN Album AS b ON a.AlbumId = b.AlbumId
+        JOIN Genre AS c ON a.GenreId = c.GenreId
+        ORDER BY a.Milliseconds DESC""",
+}
+
+# Statements sent straight to /api/execute-sql
+RAW_SQL = [
+    "SELECT COUNT(*) FROM Track",
+    "SELECT a.Title, COUNT(b.TrackId) FROM Album a JOIN Track b ON a.AlbumId = b.AlbumId GROUP BY a.Title ORDER BY 2 DESC LIMIT 10",
+    "SELECT a.BillingCity, SUM(a.Total) FROM Invoice a GROUP BY a.BillingCity ORDER BY 2 DESC LIMIT 10",
+]
+
+# Statements run through validate_sql, with whether they should pass. MySQL column names are
+# case-insensitive, so mixed-case spellings of real columns must be accepted.
+VALIDATION_CASES = [
+    ("SELECT a.Name FROM Genre a", True),
+    ("SELECT a.name FROM Genre a", True),
+    ("SELECT a.NAME, COUNT(*) FROM genre a GROUP BY a.NAME", True),
+    ("SELECT name FROM GENRE", True),
+    ("SELECT `name` FROM Genre", True),
+    ("SELECT a.name, b.title FROM Artist a JOIN Album b ON a.artistid = b.ArtistID", True),
+    ("WITH g AS (SELECT GenreId, Name FROM Genre) SELECT G.NAME FROM g G", True),
+    ("SELECT a.Nme FROM Genre a", False),
+    ("SELECT a.Name FROM Genres a", False),
+    ("DELETE FROM Genre", False),
+]
+
+# Characters per chunk when the stub streams a response
+STREAM_CHUNK_CHARS = 40
+
+# How often the job stage polls GET /api/jobs/<id>
+JOB_POLL_SECONDS = 0.02
+
+# Chart types and rows per result set when timing the two formatting paths over
+# test_formatting.py's result sets
+FORMAT_CHART_TYPES = ["bar", "table", "scatter"]
+FORMAT_ROWS = 1000
+
+FALLBACK_SQL = "SELECT a.Name, COUNT(b.AlbumId) AS AlbumCount FROM Artist a JOIN Album b ON a.ArtistId = b.ArtistId GROUP BY a.Name ORDER BY AlbumCount DESC"
+
+
+def load_chinook_sqlite(sql_path, db_path):
+    """Translate the MySQL Chinook dump into a SQLite database file"""
+    with open(sql_path, encoding="utf-8-sig") as sql_file:
+        script = sql_file.read()
+
+    # Drop N'...' national-string prefixes, leaving string contents untouched
+    parts = re.split(r"('(?:[^']|'')*')", script)
+    for i in range(0, len(parts), 2):
+        parts[i] = re.sub(r"\bN$", "", parts[i])
+        parts[i] = re.sub(r"/\*.*?\*/", "", parts[i], flags=re.S)
+    script = "".join(parts)
+
+    statements = [statement.strip() for statement in script.split(";\n") if statement.strip()]
+
+    # SQLite can't ALTER TABLE ... ADD CONSTRAINT, so fold foreign keys into CREATE TABLE
+    foreign_keys = {}
+    for statement in statements:
+        match = re.match(r"ALTER TABLE `(\w+)` ADD CONSTRAINT `\w+`\s+(FOREIGN KEY .*?REFERENCES `\w+` \(.*?\))", statement, re.S)
+        if match:
+            foreign_keys.setdefault(match.group(1), []).append(match.group(2))
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+    connection = sqlite3.connect(db_path)
+    for statement in statements:
+        if re.match(r"(DROP DATABASE|CREATE DATABASE|USE|ALTER TABLE)\b", statement):
+            continue
+        create = re.match(r"CREATE TABLE `(\w+)`", statement)
+        if create and create.group(1) in foreign_keys:
+            closing = statement.rindex(")")
+            statement = statement[:closing].rstrip() + ",\n    " + ",\n    ".join(foreign_keys[create.group(1)]) + "\n)"
+        connection.execute(statement)
+
+    # The dump stores dates as 'YYYY/M/D'; MySQL parses those, SQLite wants ISO strings
+    def iso_date(value):
+        match = re.match(r"^(\d{4})/(\d{1,2})/(\d{1,2})$", value or "")
+        return f"{match.group(1)}-{int(match.group(2)):02d}-{int(match.group(3)):02d} 00:00:00" if match else value
+    connection.create_function("iso_date", 1, iso_date)
+    for table, column in (("Employee", "BirthDate"), ("Employee", "HireDate"), ("Invoice", "InvoiceDate")):
+        connection.execute(f"UPDATE {table} SET {column} = iso_date({column})")
+
+    connection.commit()
+    connection.close()
+
+
+def build_stub_llm(latency):
+    """Create a chat model that answers the app's prompts from the canned tables above"""
+    from langchain_core.language_models.chat_models import BaseChatModel
+    from langchain_core.messages import AIMessage, AIMessageChunk
+    from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+    class StubChatModel(BaseChatModel):
+        """Deterministic stand-in for ChatOpenAI"""
+        latency: float = 0.0
+
+        @property
+        def _llm_type(self):
+            return "benchmark-stub"
+
+        def _respond(self, prompt):
+            if "Available chart types" in prompt:
+                question = prompt.rsplit("Question:", 1)[-1].strip().splitlines()[0].strip()
+                suggestions = QUESTIONS.get(question, [{"chart_type": "bar", "title": question, "sql_focus": "artists by album count"}])
+                suggestions = [dict(s, reason="benchmark") for s in suggestions]
+                if '"sql":' in prompt:
+                    # Planner prompt: answer with each chart's SQL as well
+                    for suggestion in suggestions:
+                        suggestion["sql"] = " ".join(CANNED_SQL.get(suggestion["sql_focus"], FALLBACK_SQL).split())
+                return json.dumps({"suggestions": suggestions})
+
+            if "data storytelling" in prompt:
+                return json.dumps({
+                    "introduction": "Benchmark introduction.",
+                    "transitions": [],
+                    "insights": ["Benchmark insight."],
+                    "conclusion": "Benchmark conclusion."
+                })
+
+            question = prompt.rsplit("Question:", 1)[-1]
+            for focus, query in CANNED_SQL.items():
+                if focus in question:
+                    return " ".join(query.split())
+            return FALLBACK_SQL
+
+        def _generate(self, messages, stop=None, run_manager=None, sleep=True, **kwargs):
+            if self.latency and sleep:
+                time.sleep(self.latency)
+            prompt = "\n".join(str(message.content) for message in messages)
+            content = self._respond(prompt)
+            # Rough token counts so usage accounting has something to report
+            prompt_tokens, completion_tokens = len(prompt) // 4, len(content) // 4
+            return ChatResult(
+                generations=[ChatGeneration(message=AIMessage(content=content))],
+                llm_output={"token_usage": {
+                    "prompt_tokens": prompt_tokens,
+                    "completion_tokens": completion_tokens,
+                    "total_tokens": prompt_tokens + completion_tokens
+                }}
+            )
+
+        def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+            for delay, chunk in self._chunks(messages):
+                if delay:
+                    time.sleep(delay)
+                yield chunk
+
+        # Async variants wait with asyncio.sleep, like a real HTTP client would under --asgi
+        async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs):
+            if self.latency:
+                await asyncio.sleep(self.latency)
+            return self._generate(messages, sleep=False)
+
+        async def _astream(self, messages, stop=None, run_manager=None, **kwargs):
+            for delay, chunk in self._chunks(messages):
+                if delay:
+                    await asyncio.sleep(delay)
+                yield chunk
+
+        def _chunks(self, messages):
+            """(delay, chunk) pairs for a streamed response"""
+            prompt = "\n".join(str(message.content) for message in messages)
+            content = self._respond(prompt)
+            # Spread the delay over the response so callers can overlap work with the stream
+            pieces = [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)] or [""]
+            for i, piece in enumerate(pieces):
+                usage = None
+                if i == len(pieces) - 1:
+                    usage = {
+                        "input_tokens": len(prompt) // 4,
+                        "output_tokens": len(content) // 4,
+                        "total_tokens": len(prompt) // 4 + len(content) // 4
+                    }
+                yield self.latency / len(pieces), ChatGenerationChunk(message=AIMessageChunk(content=piece, usage_metadata=usage))
+
+    return StubChatModel(latency=latency)
+
+
+def load_app(db_path, llm_latency):
+    """Import app.py against the SQLite copy of Chinook with the stub LLM"""
+    # Reuse the real chinook keywords so schema pruning behaves as it does in production
+    with open(os.path.join(BACKEND_DIR, "databases.json"), encoding="utf-8") as config_file:
+        table_keywords = json.load(config_file).get("chinook", {}).get("table_keywords", {})
+
+    config_path = os.path.join(os.path.dirname(db_path), "databases.json")
+    with open(config_path, "w", encoding="utf-8") as config_file:
+        json.dump({
+            "chinook": {
+                "uri": f"sqlite:///{db_path}",
+                "description": "Chinook loaded from Chinook_MySql.sql",
+                "pool_size": 8,
+                "max_overflow": 8,
+                "table_keywords": table_keywords
+            }
+        }, config_file)
+
+    os.environ.setdefault("OPENAI_API_KEY", "benchmark-offline")
+    os.environ["DATABASES_CONFIG"] = config_path
+    os.environ["WARM_DATABASES"] = "0"
+    os.environ.pop("SQL_CACHE_PATH", None)
+
+    sys.path.insert(0, BACKEND_DIR)
+    import app as app_module
+    app_module.llm = build_stub_llm(llm_latency)
+    return app_module
+
+
+def percentile(samples, fraction):
+    """Nearest-rank percentile of a list of numbers"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(fraction * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def summarize(name, latencies, elapsed, peak_bytes, errors, extra=None):
+    """Collapse one stage's samples into the reported numbers"""
+    summary = {
+        "stage": name,
+        "requests": len(latencies),
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "peak_memory_mb": round(peak_bytes / (1024 * 1024), 2) if peak_bytes is not None else None
+    }
+    if extra:
+        summary.update(extra)
+    return summary
+
+
+def run_stage(name, requests, send, concurrency, track_memory):
+    """Send every request through `send` on `concurrency` threads and time each one"""
+    latencies = []
+    extras = []
+    errors = 0
+    lock = threading.Lock()
+
+    def timed(payload):
+        nonlocal errors
+        start = time.perf_counter()
+        ok, extra = send(payload)
+        duration = time.perf_counter() - start
+        with lock:
+            latencies.append(duration)
+            if extra is not None:
+                extras.append(extra)
+            if not ok:
+                errors += 1
+
+    if track_memory:
+        tracemalloc.reset_peak()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(timed, requests))
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1] if track_memory else None
+
+    extra = None
+    if extras:
+        extra = {
+            "first_event_p50_ms": round(percentile(extras, 0.50) * 1000, 2),
+            "first_event_p95_ms": round(percentile(extras, 0.95) * 1000, 2)
+        }
+    return summarize(name, latencies, elapsed, peak, errors, extra)
+
+
+def check_formatting(app_module, iterations):
+    """
+    Time the two chart formatting paths over test_formatting.py's synthetic result sets.
+    That their outputs match is what test_formatting.py asserts; here only the speed counts.
+    """
+    from test_formatting import format_result_sets  # imports app, so only once load_app has
+
+    result_sets = [
+        (columns, data, column_types) for columns, data, column_types in format_result_sets(FORMAT_ROWS)
+        if app_module.format_columns_for_chart_type(data, "table", columns, column_types) is not None
+    ]
+    summaries = []
+    for name, format_data in [("format_rows", app_module.format_rows_for_chart_type),
+                              ("format_columns", app_module.format_columns_for_chart_type)]:
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(iterations):
+            for columns, data, column_types in result_sets:
+                for chart_type in FORMAT_CHART_TYPES:
+                    start = time.perf_counter()
+                    format_data(data, chart_type, columns, column_types)
+                    latencies.append(time.perf_counter() - start)
+        summaries.append(summarize(name, latencies, time.perf_counter() - started, None, 0))
+    return summaries
+
+
+def check_validation(app_module, iterations):
+    """Time validate_sql over VALIDATION_CASES; a statement accepted or rejected wrongly counts as an error"""
+    wrong = set()
+    latencies = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        for query, valid in VALIDATION_CASES:
+            start = time.perf_counter()
+            try:
+                app_module.validate_sql(query, "chinook")
+                accepted = True
+            except app_module.SQLValidationError:
+                accepted = False
+            latencies.append(time.perf_counter() - start)
+            if accepted != valid:
+                wrong.add(query)
+    for query in sorted(wrong):
+        report(f"  validation {'rejected' if dict(VALIDATION_CASES)[query] else 'accepted'}: {query}")
+    return summarize("validate_sql", latencies, time.perf_counter() - started, None, len(wrong))
+
+
+def asgi_runner(asgi_module):
+    """Run coroutines on one event loop thread shared by all benchmark clients, as a single ASGI worker would"""
+    loop = asyncio.new_event_loop()
+    threading.Thread(target=loop.run_forever, daemon=True).start()
+    client = asgi_module.asgi_app.test_client()
+
+    def run(make_coroutine):
+        return asyncio.run_coroutine_threadsafe(make_coroutine(client), loop).result()
+    return run
+
+
+def run_benchmark(app_module, iterations, concurrency, warm_cache, track_memory, asgi_module=None):
+    """Drive each endpoint through the fixed question sets and collect per-stage results"""
+    client = app_module.app.test_client()
+    questions = list(QUESTIONS) * iterations
+
+    def reset_caches():
+        if not warm_cache:
+            app_module.sql_cache.clear()
+            app_module.result_cache.clear()
+
+    def ask(question):
+        reset_caches()
+        response = client.post("/api/ask", json={"question": question, "database": "chinook"})
+        return response.status_code == 200 and response.get_json().get("success", False), None
+
+    def ask_stream(question):
+        reset_caches()
+        start = time.perf_counter()
+        first_chart = None
+        response = client.post("/api/ask/stream", json={"question": question, "database": "chinook"}, buffered=False)
+        body = ""
+        for chunk in response.response:
+            body += chunk.decode("utf-8") if isinstance(chunk, bytes) else chunk
+            if first_chart is None and "event: chart" in body:
+                first_chart = time.perf_counter() - start
+        response.close()
+        return "event: done" in body, first_chart
+
+    def ask_job(question):
+        reset_caches()
+        start = time.perf_counter()
+        first_chart = None
+        response = client.post("/api/jobs", json={"question": question, "database": "chinook"})
+        if response.status_code != 202:
+            return False, None
+        status_url = response.get_json()["status_url"]
+        while True:
+            job = client.get(status_url).get_json()
+            if first_chart is None and (job.get("charts") or job.get("result")):
+                first_chart = time.perf_counter() - start
+            if job.get("status") not in ("queued", "running"):
+                return job.get("status") == "succeeded", first_chart
+            time.sleep(JOB_POLL_SECONDS)
+
+    def ask_batch(batch):
+        reset_caches()
+        response = client.post("/api/ask/batch", json={"questions": batch, "database": "chinook"})
+        if response.status_code != 200:
+            return False, None
+        return all(result.get("success") for result in response.get_json()["results"]), None
+
+    if asgi_module is not None:
+        run_async = asgi_runner(asgi_module)
+
+        def asgi_ask(question):
+            reset_caches()
+
+            async def send(async_client):
+                response = await async_client.post("/api/ask", json={"question": question, "database": "chinook"})
+                return response.status_code == 200 and (await response.get_json()).get("success", False)
+            return run_async(send), None
+
+        def asgi_ask_stream(question):
+            reset_caches()
+            start = time.perf_counter()
+
+            async def send(async_client):
+                first_chart = None
+                body = ""
+                async with async_client.request("/api/ask/stream", method="POST",
+                                                 headers={"Content-Type": "application/json"}) as connection:
+                    await connection.send(json.dumps({"question": question, "database": "chinook"}).encode("utf-8"))
+                    await connection.send_complete()
+                    while "event: done" not in body and "event: error" not in body:
+                        body += (await connection.receive()).decode("utf-8")
+                        if first_chart is None and "event: chart" in body:
+                            first_chart = time.perf_counter() - start
+                return "event: done" in body, first_chart
+            return run_async(send)
+
+    def execute_sql(query):
+        response = client.post("/api/execute-sql", json={"query": query, "database": "chinook"})
+        return response.status_code == 200, None
+
+    def schema(refresh):
+        response = client.get(f"/api/schema?database=chinook&refresh={'true' if refresh else 'false'}")
+        return response.status_code == 200, None
+
+    # --asgi: the question routes go through asgi.py's async handlers instead
+    if asgi_module is not None:
+        send_ask, send_ask_stream = asgi_ask, asgi_ask_stream
+    else:
+        send_ask, send_ask_stream = ask, ask_stream
+
+    stages = [
+        ("ask", questions, send_ask),
+        ("ask_stream", questions, send_ask_stream),
+        ("ask_job", questions, ask_job),
+        ("ask_batch", [list(QUESTIONS)] * iterations, ask_batch),
+        ("execute_sql", RAW_SQL * iterations * 2, execute_sql),
+        ("schema_cached", [False] * iterations * 4, schema),
+        ("schema_refresh", [True] * iterations, schema),
+    ]
+
+    # One warm-up pass so imports, engine creation and first introspection aren't timed
+    client.get("/api/schema?database=chinook")
+    send_ask(next(iter(QUESTIONS)))
+
+    results = []
+    for name, requests, send in stages:
+        results.append(run_stage(name, requests, send, concurrency, track_memory))
+        print_result(results[-1])
+    for result in check_formatting(app_module, iterations) + [check_validation(app_module, iterations)]:
+        results.append(result)
+        print_result(result)
+    return results
+
+
+# Benchmark output goes to the real stdout even when --quiet swaps sys.stdout out
+REPORT = sys.stdout
+
+
+def report(message=""):
+    print(message, file=REPORT, flush=True)
+
+
+def print_result(result):
+    memory = f"{result['peak_memory_mb']:>8.2f}" if result["peak_memory_mb"] is not None else "       -"
+    line = (f"{result['stage']:<15} {result['requests']:>5} {result['errors']:>4} "
+            f"{result['p50_ms']:>9.1f} {result['p95_ms']:>9.1f} {result['p99_ms']:>9.1f} "
+            f"{result['throughput_rps']:>8.2f} {memory}")
+    if "first_event_p50_ms" in result:
+        line += f"   first chart p50 {result['first_event_p50_ms']:.1f} ms"
+    report(line)
+
+
+def compare_to_baseline(results, baseline_path, tolerance):
+    """Return the stages whose p95 grew by more than `tolerance` compared with a saved run"""
+    with open(baseline_path, encoding="utf-8") as baseline_file:
+        baseline = {result["stage"]: result for result in json.load(baseline_file)["results"]}
+
+    regressions = []
+    for result in results:
+        previous = baseline.get(result["stage"])
+        if previous and previous["p95_ms"] > 0 and result["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            regressions.append(f"{result['stage']}: p95 {previous['p95_ms']} ms -> {result['p95_ms']} ms")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline backend benchmark with a stubbed LLM and SQLite Chinook")
+    parser.add_argument("--iterations", type=int, default=5, help="passes over each question set")
+    parser.add_argument("--concurrency", type=int, default=4, help="concurrent clients per stage")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="seconds the stub LLM sleeps per call")
+    parser.add_argument("--warm-cache", action="store_true", help="keep SQL/result caches between requests")
+    parser.add_argument("--planner", action="store_true", help="plan suggestions and SQL in one LLM call")
+    parser.add_argument("--asgi", action="store_true", help="send /api/ask and /api/ask/stream through the async handlers in asgi.py")
+    parser.add_argument("--no-memory", action="store_true", help="skip tracemalloc peak memory tracking")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="compare p95 latency with a previous --json file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth over the baseline")
+    parser.add_argument("--quiet", action="store_true", help="silence the app's own logging")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="nqv-bench-")
+    db_path = os.path.join(work_dir, "chinook.db")
+    report(f"Loading {CHINOOK_SQL} into {db_path}...")
+    load_chinook_sqlite(CHINOOK_SQL, db_path)
+
+    app_module = load_app(db_path, args.llm_latency)
+    app_module.CHART_PLANNER = args.planner
+    asgi_module = None
+    if args.asgi:
+        import asgi as asgi_module
+
+    track_memory = not args.no_memory
+    if track_memory:
+        tracemalloc.start()
+
+    report(f"\n{'stage':<15} {'reqs':>5} {'errs':>4} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'req/s':>8} {'peak MB':>8}")
+    if args.quiet:
+        # The app logs with print(), which would drown out the results table
+        sys.stdout = open(os.devnull, "w")
+    try:
+        results = run_benchmark(app_module, args.iterations, args.concurrency, args.warm_cache, track_memory, asgi_module)
+    finally:
+        sys.stdout = REPORT
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump({
+                "settings": vars(args),
+                "results": results
+            }, output, indent=2)
+        report(f"\nResults written to {args.json}")
+
+    failed = [result["stage"] for result in results if result["errors"]]
+    if failed:
+        report(f"\n❌ Requests failed in: {', '.join(failed)}")
+
+    if args.baseline:
+        regressions = compare_to_baseline(results, args.baseline, args.tolerance)
+        if regressions:
+            report("\n❌ Regressions against baseline:")
+            for regression in regressions:
+                report(f"  {regression}")
+            sys.exit(1)
+        report(f"\n✅ No p95 regression beyond {args.tolerance:.0%} of {args.baseline}")
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,6 @@
+"""Test setup: import app.py offline, without warming database pools or needing an API key"""
+import os
+
+os.environ.setdefault("OPENAI_API_KEY", "test-offline")
+os.environ["WARM_DATABASES"] = "0"
+os.environ.pop("SQL_CACHE_PATH", None)
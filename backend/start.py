@@ -17,6 +17,9 @@ if not os.getenv("OPENAI_API_KEY"):
     print("OPENAI_API_KEY=your_api_key_here")
     sys.exit(1)
 
+# SERVER_MODE=asgi serves the question routes asynchronously through hypercorn (see asgi.py)
+SERVER_MODE = os.getenv("SERVER_MODE", "flask").lower()
+
 # Import and run the Flask app
 from app import app
 
@@ -26,4 +29,9 @@ if __name__ == '__main__':
     print("💡 Use Ctrl+C to stop the server")
     print("-" * 50)
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
+    if SERVER_MODE == "asgi":
+        from asgi import serve
+        print("⚡ Async mode: /api/ask and /api/ask/stream run on the event loop")
+        serve(host='0.0.0.0', port=5000)
+    else:
+        app.run(debug=True, host='0.0.0.0', port=5000)
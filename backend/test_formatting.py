@@ -0,0 +1,92 @@
+"""The column-at-a-time chart formatter must give exactly the row-by-row formatter's output"""
+import json
+import random
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+
+import app
+
+# Synthetic result sets: column names, then a pool of values per column that rows are drawn from.
+# Result sets listed in FORMAT_COLUMN_TYPES are also checked with those column types, as a MySQL
+# cursor reports them. benchmark.py times both formatters over the same sets.
+FORMAT_CASES = [
+    (["BillingCountry", "Revenue"], [["USA", "Canada", "France"], [Decimal("523.06"), Decimal("303.96"), Decimal("195.10")]]),
+    (["a.Name", "b.Milliseconds", "b.Bytes"], [["Go", "Stop", "Walk"], [343719, 210000, 5286953], [11170334, 6713451, 9]]),
+    (["Year", "Month", "InvoiceCount"], [[2009, 2010, 2011], [1, 6, 12], [6, 7]]),
+    (["a.Name", "b.Continent", "b.Population", "b.GNP"],
+     [["Aruba", "Chad", ""], ["Asia", "Europe"], [0, 103000, None], [Decimal("828.00"), Decimal("0.00"), None]]),
+    (["Name", "TrackCount"], [["Rock", "Jazz", "", None], [0, 1, 1297, 130, -5]]),
+    (["FirstName", "LastName", "Total"],
+     [["Helena", "Luis", "None"], ["Holý", "Rojas", ""], [Decimal("49.62"), Decimal("0.00"), 0, None, 1.5]]),
+    (["a.Name", "b.Continent", "b.Population", "b.GNP"],
+     [["Aruba", "Chad", None], ["Asia", "Europe"], [0, 103000, 2**60], [Decimal("828.00"), 0.0, -0.0, float("nan")]]),
+    (["Region", "Name", "Total", "total"], [["Caribbean", "Aruba"], ["Aruba", "Chad"], [0, 3, 3.0], [3, 0, "3"]]),
+    (["x_2", "x", "x", "Label", "Value", "count"], [[1, 2], ["a", "b"], [0, 2], ["l"], [1, 0], [0, 1, 2]]),
+    (["InvoiceDate", "Amount"], [[date(2009, 1, 1), date(2013, 12, 22)], ["1.5", "abc", None, "1_000", " 7 ", True]]),
+    (["Name", "Milliseconds", "Bytes"], [["Go", "Stop"], [343719, None, "12.5"], [11170334, 0, Decimal("1E3")]]),
+    (["a.Title", "b.Year", "c.Avg"], [["Up", "Heat"], [1995, 2009, 0], [10**400, 7.5]]),
+    (["Genre", "AvgPrice", "Share"], [["Rock", "Jazz"], ["12.5", "7", " 0.99 ", "n/a", None], ["1E3", "", "-2"]]),
+    (["Updated", "Plays", "Rating"],
+     [[datetime(2021, 3, 4, 5, 6, 7), None], [Decimal("12"), None, Decimal("-0.0")], ["4.5", "n/a", None]]),
+    (["Day", "Code", "Amount"], [["2009-01-01", "2010", date(2011, 5, 1), None], ["x", "1_0", "inf", b"12"], ["abc", " 7 ", 3, None]]),
+]
+FORMAT_COLUMN_TYPES = {
+    ("BillingCountry", "Revenue"): ["VARCHAR", "DECIMAL"],
+    ("a.Name", "b.Milliseconds", "b.Bytes"): ["VARCHAR", "INT", "INT"],
+    ("Year", "Month", "InvoiceCount"): ["INT", "INT", "BIGINT"],
+    ("a.Name", "b.Continent", "b.Population", "b.GNP"): ["CHAR", "ENUM", "INT", "DECIMAL"],
+    ("InvoiceDate", "Amount"): ["DATE", None],
+    ("Genre", "AvgPrice", "Share"): ["VARCHAR", "VARCHAR", "TEXT"],
+    ("Day", "Code", "Amount"): ["DATE", "ENUM", "VARCHAR"],
+    ("Updated", "Plays", "Rating"): ["DATETIME", "DECIMAL", "CHAR"],
+}
+
+CHART_TYPES = ["bar", "line", "pie", "table", "area", "scatter"]
+SEEDS = range(4)
+
+
+def format_result_sets(rows, seed=0):
+    """(columns, rows, column types) per FORMAT_CASES entry, untyped and typed, `rows` rows drawn from its pools"""
+    rng = random.Random(seed)
+    result_sets = []
+    for columns, pools in FORMAT_CASES:
+        data = [tuple(rng.choice(pool) for pool in pools) for _ in range(rows)]
+        result_sets.append((columns, data, None))
+        if tuple(columns) in FORMAT_COLUMN_TYPES:
+            result_sets.append((columns, data, FORMAT_COLUMN_TYPES[tuple(columns)]))
+    return result_sets
+
+
+def formatted(format_data, data, chart_type, columns, column_types):
+    """A formatter's output as JSON (so key order and float signs count), or the error it raised"""
+    try:
+        result = format_data(data, chart_type, columns, column_types)
+    except Exception as e:
+        return repr(e)
+    return result if result is None else json.dumps(result, default=str)
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+@pytest.mark.parametrize("chart_type", CHART_TYPES)
+def test_column_engine_matches_row_formatter(chart_type, seed):
+    for columns, data, column_types in format_result_sets(8, seed):
+        expected = formatted(app.format_rows_for_chart_type, data, chart_type, columns, column_types)
+        actual = formatted(app.format_columns_for_chart_type, data, chart_type, columns, column_types)
+        # None means the column engine leaves this result set to the row-by-row path
+        if actual is not None:
+            assert actual == expected, f"{chart_type} {columns} {column_types or 'untyped'}"
+
+
+def test_column_engine_handles_typed_result_sets():
+    for columns, data, column_types in format_result_sets(8):
+        if column_types is not None:
+            assert app.format_columns_for_chart_type(data, "bar", columns, column_types) is not None, columns
+
+
+def test_text_columns_chart_numeric_strings():
+    data = [("a", "12.5"), ("b", "7"), ("c", "n/a")]
+    for format_data in (app.format_rows_for_chart_type, app.format_columns_for_chart_type):
+        rows = format_data(data, "bar", ["Label", "Amount"], ["VARCHAR", "VARCHAR"])
+        assert [row["value"] for row in rows] == [12.5, 7.0, 0.0]
@@ -0,0 +1,18 @@
+"""/metrics output must stay valid Prometheus text whatever the label values are"""
+import app
+
+
+def test_label_values_are_escaped():
+    registry = app.MetricsRegistry()
+    registry.describe("nqv_test_total", "counter", "Test counter")
+    registry.increment("nqv_test_total", database='we"ird\\db\nname')
+    assert 'nqv_test_total{database="we\\"ird\\\\db\\nname"} 1' in registry.render().splitlines()
+
+
+def test_histogram_labels_are_escaped():
+    registry = app.MetricsRegistry()
+    registry.describe("nqv_test_seconds", "histogram", "Test histogram")
+    registry.observe("nqv_test_seconds", 0.2, stage='a"b')
+    lines = registry.render().splitlines()
+    assert 'nqv_test_seconds_count{stage="a\\"b"} 1' in lines
+    assert all("\n" not in line for line in lines)
@@ -0,0 +1,82 @@
+"""Schema pruning must keep every table needed to join the tables it selects"""
+import json
+import os
+
+import pytest
+
+import app
+
+# Chinook's tables, columns and foreign keys (child -> parents), as describe_tables reports them
+CHINOOK_TABLES = {
+    "Album": (["AlbumId", "Title", "ArtistId"], ["Artist"]),
+    "Artist": (["ArtistId", "Name"], []),
+    "Customer": (["CustomerId", "FirstName", "LastName", "Company", "City", "Country", "Email", "SupportRepId"],
+                 ["Employee"]),
+    "Employee": (["EmployeeId", "LastName", "FirstName", "Title", "ReportsTo", "HireDate", "City", "Country"], []),
+    "Genre": (["GenreId", "Name"], []),
+    "Invoice": (["InvoiceId", "CustomerId", "InvoiceDate", "BillingCity", "BillingCountry", "Total"], ["Customer"]),
+    "InvoiceLine": (["InvoiceLineId", "InvoiceId", "TrackId", "UnitPrice", "Quantity"], ["Invoice", "Track"]),
+    "MediaType": (["MediaTypeId", "Name"], []),
+    "Playlist": (["PlaylistId", "Name"], []),
+    "PlaylistTrack": (["PlaylistId", "TrackId"], ["Playlist", "Track"]),
+    "Track": (["TrackId", "Name", "AlbumId", "MediaTypeId", "GenreId", "Composer", "Milliseconds", "Bytes", "UnitPrice"],
+              ["Album", "Genre", "MediaType"]),
+}
+
+QUESTIONS = [
+    "Top artists by revenue - Focus: total revenue per artist",
+    "Who are our top customers?",
+    "sales by genre",
+    "Which playlists have the most tracks",
+    "employees and the customers they support",
+    "revenue by media format",
+    "albums with the longest tracks",
+    "invoice totals by billing country",
+]
+
+
+@pytest.fixture(scope="module")
+def entry():
+    with open(os.path.join(os.path.dirname(__file__), "databases.json"), encoding="utf-8") as config_file:
+        keywords = json.load(config_file)["chinook"]["table_keywords"]
+    tables = {
+        name: {"columns": columns, "references": references, "referenced_by": []}
+        for name, (columns, references) in CHINOOK_TABLES.items()
+    }
+    for name, table in tables.items():
+        for parent in table["references"]:
+            tables[parent]["referenced_by"].append(name)
+    return {"tables": tables, "index": app.build_schema_index(tables, keywords)}
+
+
+def is_join_connected(tables, selected):
+    """Whether the selected tables form one component over their own foreign keys"""
+    reached = {selected[0]}
+    queue = [selected[0]]
+    for name in queue:
+        for neighbour in tables[name]["references"] + tables[name]["referenced_by"]:
+            if neighbour in selected and neighbour not in reached:
+                reached.add(neighbour)
+                queue.append(neighbour)
+    return reached == set(selected)
+
+
+@pytest.mark.parametrize("question", QUESTIONS)
+def test_pruned_tables_stay_join_connected(entry, question):
+    selected = app.select_relevant_tables(entry, question, max_tables=6)
+    assert selected
+    assert is_join_connected(entry["tables"], selected), selected
+
+
+def test_artist_revenue_keeps_album_between_artist_and_track(entry):
+    selected = app.select_relevant_tables(entry, QUESTIONS[0], max_tables=6)
+    assert {"Artist", "Album", "Track", "InvoiceLine"} <= set(selected)
+
+
+def test_top_customers_keeps_their_invoices(entry):
+    selected = app.select_relevant_tables(entry, "Who are our top customers?", max_tables=6)
+    assert {"Customer", "Invoice"} <= set(selected)
+
+
+def test_no_pruning_when_disabled(entry):
+    assert app.select_relevant_tables(entry, "sales by genre", max_tables=0) == list(CHINOOK_TABLES)
@@ -1,6 +1,7 @@
 'use client'
 
-import { useEffect, useRef } from 'react'
+import { useEffect, useRef, useState, UIEvent } from 'react'
+import axios from 'axios'
 import {
   Chart as ChartJS,
   CategoryScale,
@@ -27,12 +28,61 @@ ChartJS.register(
   Legend
 )
 
+type ChartRow = { label: string; value: number; x?: number; y?: number; [key: string]: any }
+
+// format: 'columnar' responses: column names once, then one array per column
+interface ColumnarData {
+  columns: string[]
+  types: string[]
+  values: any[][]
+}
+
+// Table charts with more rows than they came with; the rest is fetched a page at a time
+interface ChartPaging {
+  chart_id: string
+  cursor: string | null
+  page_size: number
+  total_rows: number
+}
+
 interface ChartData {
   title: string
   x_axis: string
   y_axis: string
   chart_type?: string
-  data: { label: string; value: number; x?: number; y?: number; [key: string]: any }[]
+  data: ChartRow[] | ColumnarData
+  paging?: ChartPaging
+}
+
+interface RowsPageResponse {
+  success: boolean
+  data: ColumnarData
+  next_cursor: string | null
+}
+
+// Work on columns whichever format the backend sent
+function toColumnar(data: ChartRow[] | ColumnarData): ColumnarData {
+  if (!Array.isArray(data)) return data
+  const columns = Array.from(new Set(data.flatMap(row => Object.keys(row))))
+  return {
+    columns,
+    types: columns.map(() => 'string'),
+    values: columns.map(column => data.map(row => row[column]))
+  }
+}
+
+// Add a page's rows under the matching columns; a column only one side has is null on the other
+function appendColumnar(table: ColumnarData, page: ColumnarData): ColumnarData {
+  const columns = Array.from(new Set([...table.columns, ...page.columns]))
+  const tableRows = table.values.length ? table.values[0].length : 0
+  const pageRows = page.values.length ? page.values[0].length : 0
+  const cells = (data: ColumnarData, column: string, rows: number) =>
+    data.values[data.columns.indexOf(column)] || Array(rows).fill(null)
+  return {
+    columns,
+    types: columns.map(column => table.types[table.columns.indexOf(column)] || page.types[page.columns.indexOf(column)]),
+    values: columns.map(column => [...cells(table, column, tableRows), ...cells(page, column, pageRows)])
+  }
 }
 
 interface Narrative {
@@ -43,7 +93,8 @@ interface Narrative {
 }
 
 interface ChartComponentProps {
-  data: ChartData | ChartData[]
+  // null entries are charts that are still being generated (streaming mode)
+  data: ChartData | (ChartData | null)[]
   narrative?: Narrative
 }
 
@@ -70,7 +121,7 @@ export default function ChartComponent({ data, narrative }: ChartComponentProps)
             <div key={index}>
               {/* Chart */}
               <div className="bg-gray-800 rounded-lg p-6 border border-gray-700">
-                <SingleChart data={chartData} />
+                {chartData ? <SingleChart data={chartData} /> : <ChartPlaceholder />}
               </div>
               
               {/* Transition text (between charts) */}
@@ -110,82 +161,153 @@ export default function ChartComponent({ data, narrative }: ChartComponentProps)
   }
   
   // For single chart, render normally
-  return <SingleChart data={chartsData[0]} />
+  return chartsData[0] ? <SingleChart data={chartsData[0]} /> : <ChartPlaceholder />
+}
+
+// Shown in place of a chart whose data hasn't arrived yet
+function ChartPlaceholder() {
+  return (
+    <div className="h-64 w-full flex items-center justify-center space-x-3">
+      <div className="w-5 h-5 border-2 border-gray-600 border-t-gray-400 rounded-full animate-spin"></div>
+      <span className="text-sm text-gray-400">Generating chart...</span>
+    </div>
+  )
+}
+
+// Table charts load the rest of their rows while the user scrolls
+function TableChart({ data }: { data: ChartData }) {
+  const [table, setTable] = useState<ColumnarData>(() => toColumnar(data.data))
+  const [cursor, setCursor] = useState<string | null>(data.paging?.cursor ?? null)
+  const [loading, setLoading] = useState(false)
+  const [pageError, setPageError] = useState<string | null>(null)
+  const fetching = useRef(false)  // scroll events outrun the loading state
+
+  // A new answer replaces the rows loaded for the previous one
+  useEffect(() => {
+    setTable(toColumnar(data.data))
+    setCursor(data.paging?.cursor ?? null)
+    setPageError(null)
+  }, [data])
+
+  const rowCount = table.values.length ? table.values[0].length : 0
+  const totalRows = data.paging?.total_rows ?? rowCount
+
+  const loadMore = async () => {
+    if (!data.paging || !cursor || fetching.current) return
+    fetching.current = true
+    setLoading(true)
+    try {
+      const response = await axios.get<RowsPageResponse>(
+        `http://192.168.0.193:5000/api/charts/${data.paging.chart_id}/rows`,
+        { params: { cursor, limit: data.paging.page_size, format: 'columnar' } }
+      )
+      setTable(current => appendColumnar(current, response.data.data))
+      setCursor(response.data.next_cursor)
+    } catch (err: any) {
+      // Usually the chart expired on the server; ask again to page through it
+      setPageError(err.response?.data?.error || 'Failed to load more rows')
+      setCursor(null)
+    } finally {
+      fetching.current = false
+      setLoading(false)
+    }
+  }
+
+  const handleScroll = (event: UIEvent<HTMLDivElement>) => {
+    const el = event.currentTarget
+    if (el.scrollHeight - el.scrollTop - el.clientHeight < 200) loadMore()
+  }
+
+  return (
+    <div className="space-y-3">
+      <div className="flex justify-between items-center mb-3">
+        <h2 className="text-lg font-semibold text-white">{data.title}</h2>
+        <div className="text-xs text-gray-400">
+Table View - {rowCount < totalRows ? `${rowCount.toLocaleString()} of ${totalRows.toLocaleString()}` : rowCount} items
+        </div>
+      </div>
+      
+      
+      <div className="overflow-x-auto max-h-[32rem] overflow-y-auto" onScroll={handleScroll}>
+        <table className="min-w-full bg-gray-800 rounded-lg border border-gray-700">
+          <thead className="bg-gray-700 sticky top-0">
+            <tr>
+              {table.columns.map((key, index) => (
+                <th key={key} className={`px-4 py-2 text-xs font-medium text-gray-300 uppercase tracking-wider ${
+                  index === 0 ? 'text-left' : 'text-right'
+                }`}>
+                  {key === 'label' ? (data.x_axis || 'Item') : 
+                   key === 'value' ? (data.y_axis || 'Value') : 
+                   key.charAt(0).toUpperCase() + key.slice(1)}
+                </th>
+              ))}
+            </tr>
+          </thead>
+          <tbody className="divide-y divide-gray-700">
+            {Array.from({ length: rowCount }, (_, index) => (
+              <tr key={index} className="hover:bg-gray-700">
+                {table.values.map((cells, cellIndex) => cells[index]).map((value, cellIndex) => (
+                  <td key={table.columns[cellIndex]} className={`px-4 py-2 text-xs ${
+                    cellIndex === 0 ? 'text-gray-200' : 'text-gray-300 text-right font-medium'
+                  }`}>
+                    {typeof value === "number" 
+                      ? value.toLocaleString() 
+                      : value || "-"}
+                  </td>
+                ))}
+              </tr>
+            ))}
+          </tbody>
+        </table>
+        {loading && (
+          <div className="py-3 text-center text-xs text-gray-400">Loading more rows...</div>
+        )}
+      </div>
+      
+      {pageError && (
+        <div className="text-xs text-red-400">{pageError}</div>
+      )}
+      
+      <div className="text-xs text-gray-400 mt-3">
+        💡 This data is best displayed as a table due to its complexity or detailed nature.
+      </div>
+
+    </div>
+  )
 }
 
 // Single chart component
 function SingleChart({ data }: { data: ChartData }) {
   const chartType = data.chart_type || 'bar'
   
-  const labels = data.data.map(item => item.label)
-  const values = data.data.map(item => item.value)
+  const table = toColumnar(data.data)
+  const column = (name: string) => table.values[table.columns.indexOf(name)] || []
+  const rowCount = table.values.length ? table.values[0].length : 0
+  
+  const labels = column('label')
+  const values = column('value')
   
   // Handle scatter plot data differently
-  const scatterData = data.data.map(item => ({
-    x: item.x || item.value,
-    y: item.y || item.value,
-    label: item.label  // Keep the label for tooltips
+  const xs = column('x')
+  const ys = column('y')
+  const counts = column('count')  // Points a binned scatter point stands for
+  const scatterData = labels.map((label, i) => ({
+    x: xs[i] || values[i],
+    y: ys[i] || values[i],
+    label,  // Keep the label for tooltips
+    count: counts[i]
   }))
 
   // Debug logging for scatter plots
   if (chartType === 'scatter') {
-    console.log('Scatter plot data:', data.data.slice(0, 3))
     console.log('Processed scatter data:', scatterData.slice(0, 3))
     console.log('Chart type:', chartType)
-    console.log('Data length:', data.data.length)
+    console.log('Data length:', rowCount)
   }
 
   // If chart type is table, render table instead
   if (chartType === 'table') {
-    return (
-      <div className="space-y-3">
-        <div className="flex justify-between items-center mb-3">
-          <h2 className="text-lg font-semibold text-white">{data.title}</h2>
-          <div className="text-xs text-gray-400">
-Table View - {data.data.length} items
-          </div>
-        </div>
-        
-        
-        <div className="overflow-x-auto">
-          <table className="min-w-full bg-gray-800 rounded-lg border border-gray-700">
-            <thead className="bg-gray-700">
-              <tr>
-                {Object.keys(data.data[0] || {}).map((key, index) => (
-                  <th key={key} className={`px-4 py-2 text-xs font-medium text-gray-300 uppercase tracking-wider ${
-                    index === 0 ? 'text-left' : 'text-right'
-                  }`}>
-                    {key === 'label' ? (data.x_axis || 'Item') : 
-                     key === 'value' ? (data.y_axis || 'Value') : 
-                     key.charAt(0).toUpperCase() + key.slice(1)}
-                  </th>
-                ))}
-              </tr>
-            </thead>
-            <tbody className="divide-y divide-gray-700">
-              {data.data.map((item, index) => (
-                <tr key={index} className="hover:bg-gray-700">
-                  {Object.entries(item).map(([key, value], cellIndex) => (
-                    <td key={key} className={`px-4 py-2 text-xs ${
-                      cellIndex === 0 ? 'text-gray-200' : 'text-gray-300 text-right font-medium'
-                    }`}>
-                      {typeof value === "number" 
-                        ? value.toLocaleString() 
-                        : value || "-"}
-                    </td>
-                  ))}
-                </tr>
-              ))}
-            </tbody>
-          </table>
-        </div>
-        
-        <div className="text-xs text-gray-400 mt-3">
-          💡 This data is best displayed as a table due to its complexity or detailed nature.
-        </div>
-
-      </div>
-    )
+    return <TableChart data={data} />
   }
 
   // Color palette for charts
@@ -254,7 +376,8 @@ Table View - {data.data.length} items
           label: function(context: any) {
             if (chartType === 'scatter') {
               const point = context.raw
-              return `${point.label}: (${point.x}, ${point.y})`
+              const binned = point.count > 1 ? ` and ${point.count - 1} nearby points` : ''
+              return `${point.label}${binned}: (${point.x}, ${point.y})`
             }
             const value = context.parsed.y || context.parsed
             return `${context.dataset.label}: ${value}`
@@ -326,7 +449,7 @@ Table View - {data.data.length} items
         <div className="flex items-center space-x-2 text-xs text-gray-400">
           <span>{getChartTypeName()}</span>
           <span>•</span>
-          <span>{data.data.length} items</span>
+          <span>{rowCount} items</span>
         </div>
       </div>
       
@@ -352,11 +475,11 @@ Table View - {data.data.length} items
                 </tr>
               </thead>
               <tbody>
-                {data.data.map((item, index) => (
+                {labels.map((label, index) => (
                   <tr key={index} className="border-t border-gray-700">
-                    <td className="px-3 py-2 text-xs text-gray-200">{item.label}</td>
+                    <td className="px-3 py-2 text-xs text-gray-200">{label}</td>
                     <td className="px-3 py-2 text-xs text-gray-300 text-right font-medium">
-                      {typeof item.value === 'number' ? item.value.toLocaleString() : (item.value ?? '-')}
+                      {typeof values[index] === 'number' ? values[index].toLocaleString() : (values[index] ?? '-')}
                     </td>
                   </tr>
                 ))}
@@ -1,6 +1,6 @@
 'use client'
 
-import { useState, useEffect } from 'react'
+import { useState, useEffect, useRef } from 'react'
 import axios from 'axios'
 
 const API_BASE = process.env.NEXT_PUBLIC_API_BASE || 'http://localhost:5000'
@@ -11,7 +11,10 @@ interface ChartData {
   x_axis: string
   y_axis: string
   chart_type?: string
-  data: { label: string; value: number; x?: number; y?: number; [key: string]: any }[]
+  // Rows, or { columns, types, values } since we ask for format: 'columnar'
+  data: { label: string; value: number; x?: number; y?: number; [key: string]: any }[] | { columns: string[]; types: string[]; values: any[][] }
+  // Table charts with more rows than they came with (see ChartComponent)
+  paging?: { chart_id: string; cursor: string | null; page_size: number; total_rows: number }
 }
 
 interface Narrative {
@@ -34,14 +37,53 @@ interface Database {
   [key: string]: string
 }
 
+// One Server-Sent Events message from /api/ask/stream
+interface StreamEvent {
+  event: string
+  data: any
+}
+
+// Read an SSE response body and hand each complete event to onEvent
+async function readEventStream(response: Response, onEvent: (event: StreamEvent) => void) {
+  const reader = response.body!.getReader()
+  const decoder = new TextDecoder()
+  let buffer = ''
+
+  while (true) {
+    const { done, value } = await reader.read()
+    if (done) break
+    buffer += decoder.decode(value, { stream: true })
+
+    let separator
+    while ((separator = buffer.indexOf('\n\n')) !== -1) {
+      const raw = buffer.slice(0, separator)
+      buffer = buffer.slice(separator + 2)
+
+      let event = 'message'
+      let data = ''
+      for (const line of raw.split('\n')) {
+        if (line.startsWith('event:')) event = line.slice(6).trim()
+        else if (line.startsWith('data:')) data += line.slice(5).trim()
+      }
+      if (data) onEvent({ event, data: JSON.parse(data) })
+    }
+  }
+}
+
 interface DatabaseResponse {
   success: boolean
   databases: Database
 }
 
+// Sent with each question so the backend can cancel its work when we stop waiting for it
+const newRequestId = () =>
+  typeof crypto !== 'undefined' && 'randomUUID' in crypto
+    ? crypto.randomUUID()
+    : `${Date.now().toString(16)}-${Math.random().toString(16).slice(2)}`
+
 export default function Home() {
   const [question, setQuestion] = useState('')
-  const [chartData, setChartData] = useState<ChartData | ChartData[] | null>(null)
+  const [chartData, setChartData] = useState<ChartData | (ChartData | null)[] | null>(null)
   const [narrative, setNarrative] = useState<Narrative | null>(null)
   const [loading, setLoading] = useState(false)
   const [error, setError] = useState<string | null>(null)
@@ -49,22 +91,44 @@ export default function Home() {
   const [databases, setDatabases] = useState<Database>({})
   const [loadingDatabases, setLoadingDatabases] = useState(true)
   const [multipleCharts, setMultipleCharts] = useState(true)
+  const activeRequest = useRef<{ id: string, controller: AbortController } | null>(null)
+
+  // Abort the in-flight question and tell the backend to stop its LLM calls and queries
+  const cancelRequest = () => {
+    const current = activeRequest.current
+    if (!current) return
+    activeRequest.current = null
+    current.controller.abort()
+    axios.post(`http://192.168.0.193:5000/api/ask/${current.id}/cancel`).catch(() => {})
+  }
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault()
     if (!question.trim()) return
 
+    cancelRequest()
+    const requestId = newRequestId()
+    const controller = new AbortController()
+    activeRequest.current = { id: requestId, controller }
+
     setLoading(true)
     setError(null)
     setChartData(null)
     setNarrative(null)
 
+    if (multipleCharts) {
+      await streamCharts(requestId, controller)
+      return
+    }
+
     try {
       const response = await axios.post<ApiResponse>('http://192.168.0.193:5000/api/ask', {
         question: question.trim(),
         database: selectedDatabase,
-        multiple_charts: multipleCharts
-      })
+        multiple_charts: multipleCharts,
+        request_id: requestId,
+        format: 'columnar'
+      }, { signal: controller.signal })
 
       if (response.data.success) {
         setChartData(response.data.data)
@@ -73,9 +137,67 @@ export default function Home() {
         setError(response.data.error || 'Unknown error occurred')
       }
     } catch (err: any) {
-      setError(err.response?.data?.error || 'Failed to connect to the backend')
+      if (!controller.signal.aborted) {
+        setError(err.response?.data?.error || 'Failed to connect to the backend')
+      }
+    } finally {
+      finishRequest(requestId)
+    }
+  }
+
+  const finishRequest = (requestId: string) => {
+    if (activeRequest.current?.id === requestId) activeRequest.current = null
+    setLoading(current => activeRequest.current ? current : false)
+  }
+
+  // Multi-chart answers are streamed so each chart renders as soon as its query finishes
+  const streamCharts = async (requestId: string, controller: AbortController) => {
+    try {
+      const response = await fetch('http://192.168.0.193:5000/api/ask/stream', {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          question: question.trim(),
+          database: selectedDatabase,
+          request_id: requestId,
+          format: 'columnar'
+        }),
+        signal: controller.signal
+      })
+
+      if (!response.ok || !response.body) {
+        const body = await response.json().catch(() => ({}))
+        setError(body.error || 'Failed to connect to the backend')
+        return
+      }
+
+      await readEventStream(response, ({ event, data }) => {
+        switch (event) {
+          case 'suggestions':
+            // Placeholders keep charts in suggestion order while they arrive
+            setChartData(new Array(data.suggestions.length).fill(null))
+            break
+          case 'chart':
+            setChartData(previous => {
+              const charts = Array.isArray(previous) ? [...previous] : []
+              charts[data.index] = data.chart
+              return charts
+            })
+            break
+          case 'narrative':
+            setNarrative(data.narrative)
+            break
+          case 'error':
+            if (data.code !== 'request_cancelled') setError(data.error || 'Unknown error occurred')
+            break
+        }
+      })
+    } catch (err: any) {
+      if (!controller.signal.aborted) {
+        setError(err.message || 'Failed to connect to the backend')
+      }
     } finally {
-      setLoading(false)
+      finishRequest(requestId)
     }
   }
 
@@ -103,6 +225,9 @@ export default function Home() {
     loadDatabases()
   }, [])
 
+  // Leaving the page cancels whatever is still running for it
+  useEffect(() => cancelRequest, [])
+
   // Sample questions for each database
   const sampleQuestions = {
     chinook: [
@@ -297,18 +422,26 @@ export default function Home() {
                     />
                   </div>
 
-                  {/* Send Button */}
-                  <button
-                    type="submit"
-                    disabled={loading || !question.trim()}
-                    className="px-4 py-3 bg-blue-600 text-white rounded-lg hover:bg-blue-700 focus:ring-2 focus:ring-blue-500 disabled:opacity-50 disabled:cursor-not-allowed text-sm font-medium"
-                  >
-                    {loading ? (
+                  {/* Send / Stop Button */}
+                  {loading ? (
+                    <button
+                      type="button"
+                      onClick={cancelRequest}
+                      title="Stop"
+                      className="px-4 py-3 bg-gray-600 text-white rounded-lg hover:bg-gray-500 focus:ring-2 focus:ring-blue-500 text-sm font-medium flex items-center space-x-2"
+                    >
                       <div className="w-4 h-4 border-2 border-white border-t-transparent rounded-full animate-spin"></div>
-                    ) : (
-                      'Send'
-                    )}
-                  </button>
+                      <span>Stop</span>
+                    </button>
+                  ) : (
+                    <button
+                      type="submit"
+                      disabled={!question.trim()}
+                      className="px-4 py-3 bg-blue-600 text-white rounded-lg hover:bg-blue-700 focus:ring-2 focus:ring-blue-500 disabled:opacity-50 disabled:cursor-not-allowed text-sm font-medium"
+                    >
+                      Send
+                    </button>
+                  )}
                 </div>
               </div>
             </div>